@@ -55,7 +55,9 @@ class CollectionScheduler:
         
         for invoice in self.state.get_all_unpaid():
             due_date = datetime.fromisoformat(invoice["due_date"])
-            days_until_due = (due_date - now).days
+            # Calendar-day difference: timedelta.days truncates toward zero,
+            # so "due in 3 days minus a minute" would otherwise count as 2
+            days_until_due = (due_date.date() - now.date()).days
             
             for rule_name, rule in self.REMINDER_RULES.items():
                 # Check for reminders before due date
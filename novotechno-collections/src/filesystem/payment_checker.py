@@ -4,6 +4,9 @@ import re
 from decimal import Decimal
 import logging
 
+# Single automaton pass instead of one substring scan per known method
+_METHOD_RE = re.compile(r"bancolombia|davivienda|transfer|pago|payment")
+
 class PaymentConfidenceChecker:
     """Check if payment file matches an invoice"""
     
@@ -56,16 +59,9 @@ class PaymentConfidenceChecker:
         filepath_lower = filepath.lower()
         
         # Extract from filename
-        if "bancolombia" in filepath_lower:
-            data["method"] = "bancolombia"
-        elif "davivienda" in filepath_lower:
-            data["method"] = "davivienda"
-        elif "transfer" in filepath_lower:
-            data["method"] = "transfer"
-        elif "pago" in filepath_lower:
-            data["method"] = "pago"
-        elif "payment" in filepath_lower:
-            data["method"] = "payment"
+        method_match = _METHOD_RE.search(filepath_lower)
+        if method_match:
+            data["method"] = method_match.group(0)
         
         # Extract amount from filename pattern
         # Match formats like: $123.45, 1,234.56, 12345.67
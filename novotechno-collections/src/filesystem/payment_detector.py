@@ -1,5 +1,8 @@
 import time
 import logging
+import os
+import queue
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from typing import Dict, Callable
@@ -9,30 +12,99 @@ import hashlib
 import re
 from datetime import datetime
 
+class DedupWorkQueue:
+    """Coalescing work queue: duplicate keys are dropped while still pending"""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay  # Coalescing delay before processing an item
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def add(self, key, item) -> bool:
+        """Enqueue item unless the same key is already pending"""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._queue.put((key, item))
+        return True
+
+    def get(self, timeout: float = None):
+        """Dequeue next (key, item) pair, blocking up to timeout"""
+        return self._queue.get(timeout=timeout)
+
+    def done(self, key):
+        """Mark key as processed, allowing it to be enqueued again"""
+        with self._lock:
+            self._pending.discard(key)
+        self._queue.task_done()
+
+    def join(self):
+        """Block until all enqueued items have been processed"""
+        self._queue.join()
+
 class PaymentEventHandler(FileSystemEventHandler):
     """Handle filesystem events for payment detection"""
-    
+
     def __init__(self, state_manager, confidence_checker: Callable):
         self.state = state_manager
         self.check_confidence = confidence_checker
         self.logger = logging.getLogger(__name__)
         self.recent_files = {}  # Track recent events for deduplication
-    
+
+        # Coalesce event bursts (temp-rename writes, batch copies) off the
+        # observer dispatcher thread so detection never stalls
+        self.work_queue = DedupWorkQueue(delay=0.1)
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._drain_queue, daemon=True)
+        self._worker.start()
+
     def on_created(self, event):
         if event.is_directory:
             return
-        
+
         # Check for payment file pattern
         if self._is_payment_file(event.src_path):
-            self._process_payment_file(event.src_path)
-    
+            self._enqueue(event.src_path)
+
     def on_moved(self, event):
         if event.is_directory:
             return
-        
+
         # Detect .pdf.tmp -> .pdf moves (common payment pattern)
         if event.dest_path.endswith(".pdf") and event.src_path.endswith(".pdf.tmp"):
-            self._process_payment_file(event.dest_path)
+            self._enqueue(event.dest_path)
+
+    def _enqueue(self, filepath: str):
+        """Queue file for processing, collapsing rapid duplicate events"""
+        try:
+            st = os.stat(filepath)
+            key = (filepath, st.st_size, st.st_mtime)
+        except OSError:
+            key = (filepath, 0, 0)
+        self.work_queue.add(key, filepath)
+
+    def _drain_queue(self):
+        """Background worker: process queued payment files"""
+        while not self._stopped.is_set():
+            try:
+                key, filepath = self.work_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            # Coalescing delay: later events for the same file are dropped
+            # while this one is still pending
+            time.sleep(self.work_queue.delay)
+            try:
+                self._process_payment_file(filepath)
+            finally:
+                self.work_queue.done(key)
+
+    def stop(self):
+        """Flush pending work and stop the background worker"""
+        self.work_queue.join()
+        self._stopped.set()
     
     def _is_payment_file(self, filepath: str) -> bool:
         """Check if file matches payment patterns"""
@@ -148,6 +220,10 @@ class PaymentDetector:
     
     def stop(self):
         """Stop watching"""
+        # Stop the event source first: once the observer is down no new
+        # work can arrive, so the handler drain below is bounded and
+        # nothing is accepted after the worker stops
         self.observer.stop()
         self.observer.join()
+        self.handler.stop()
         self.logger.info("🛑 Payment watcher stopped")
\ No newline at end of file
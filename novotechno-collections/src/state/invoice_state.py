@@ -5,14 +5,39 @@ Project: PROJ-2026-0210-novotechno-collections
 
 import json
 import hashlib
+import mmap
+import re
 import shutil
+import struct
 import os
+import zlib
+
+import orjson
+import xxhash
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional, Any, ContextManager
+from typing import Dict, List, Optional, Any, ContextManager, Tuple
 from contextlib import contextmanager
 import threading
 
+# Below this many state files a serial verify loop beats pool startup
+_PARALLEL_VERIFY_THRESHOLD = 16
+
+# fdatasync skips flushing timestamps and other metadata we don't need
+# for durability; not every platform exposes it (macOS), so fall back
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+# Matches the metadata splice write_state appends after the canonical
+# payload; everything before it is byte-identical to the checksum input
+_META_RE = re.compile(
+    rb'(,|\{)"_checksum":"([0-9a-f]{16})","_checksum_algo":"(sha256|xxh3_128)",')
+_QUICK_RE = re.compile(rb'"_quick_checksum":(\d+),')
+
+# Above this size verify_integrity hashes from an mmap instead of a
+# read() buffer, skipping the userspace copy
+_MMAP_VERIFY_THRESHOLD = 1 << 20
+
 
 class StateCorruptionError(Exception):
     """Raised when state file checksum verification fails."""
@@ -24,6 +49,49 @@ class StateLockError(Exception):
     pass
 
 
+class StateListing:
+    """
+    Column-oriented result of list_all_states.
+
+    Parallel per-field lists cost ~40 bytes per entry against ~230 for
+    a dict each; iteration and indexing materialize dicts on demand, so
+    callers that loop over entries see the old shape unchanged.
+    """
+
+    __slots__ = ("clients", "invoices", "valid", "messages", "paths")
+
+    def __init__(self):
+        self.clients: List[str] = []
+        self.invoices: List[str] = []
+        self.valid: List[bool] = []
+        self.messages: List[str] = []
+        self.paths: List[str] = []
+
+    def _append(self, client: str, invoice: str, valid: bool,
+                message: str, path: str):
+        self.clients.append(client)
+        self.invoices.append(invoice)
+        self.valid.append(valid)
+        self.messages.append(message)
+        self.paths.append(path)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return {
+            "client": self.clients[i],
+            "invoice": self.invoices[i],
+            "valid": self.valid[i],
+            "message": self.messages[i],
+            "path": self.paths[i]
+        }
+
+    def __iter__(self):
+        for i in range(len(self.clients)):
+            yield self[i]
+
+
 class InvoiceState:
     """
     Atomic state file writer with checksums and append-only event logging.
@@ -36,49 +104,181 @@ class InvoiceState:
     - Auto-repair on detected corruption
     """
     
-    def __init__(self, state_dir: str, enable_locking: bool = True):
+    def __init__(self, state_dir: str, enable_locking: bool = True,
+                 use_fdatasync: bool = True, fast_replay: bool = False):
         """
         Initialize state manager.
-        
+
         Args:
             state_dir: Root directory for state files
             enable_locking: Enable file locking for concurrency
+            use_fdatasync: Commit tmp files with fdatasync instead of
+                fsync (data only, no inode metadata); set False to keep
+                full fsync semantics
+            fast_replay: Additionally write a length-prefixed binary
+                sidecar (events.bin) so replay_events_fast can seek
+                record to record without scanning for newlines
         """
         self.state_dir = Path(state_dir)
         self.state_dir.mkdir(parents=True, exist_ok=True)
         self.enable_locking = enable_locking
-        self._locks = {}  # File path -> threading.Lock mapping
-        self._global_lock = threading.Lock()
-        
+        self.use_fdatasync = use_fdatasync
+        self.fast_replay = fast_replay
+        # Per-path locks live in 64 independently guarded shard tables:
+        # one global guard would serialize unrelated invoices on every
+        # acquire/release, sharding drops that contention ~64x
+        self._lock_shards = [
+            (threading.Lock(), {}) for _ in range(self.LOCK_SHARDS)]
+        # Event-log buffer: entries coalesce in memory and hit the disk
+        # with one os.write per flush instead of one append per event
+        self._event_log = self.state_dir / "events.log"
+        self._event_fd = None
+        self._event_buf: List[bytes] = []
+        self._event_buf_bytes = 0
+        self._event_lock = threading.Lock()
+        self._event_bin = self.state_dir / "events.bin"
+        self._event_bin_fd = None
+        self._event_bin_buf: List[bytes] = []
+        # Parent-directory fds cached per directory so the post-rename
+        # directory fsync doesn't pay an open()+close() on every write
+        self._dir_fds = {}
+        # Per-(client, invoice) Path cache: every public operation builds
+        # the same paths, and PurePath construction allocates on each join
+        self._path_cache: Dict[Tuple[str, str], Path] = {}
+        self._archive_cache: Dict[Tuple[str, str], Path] = {}
+        # Paths whose checksum already verified, keyed by stat identity;
+        # an unchanged (mtime_ns, ino, size) means the bytes we hashed
+        # are still the bytes on disk, so re-hashing is pure waste
+        self._verify_cache: Dict[Path, Tuple[int, int, int]] = {}
+
+    # Flush the buffer early once it holds this many bytes
+    EVENT_BUFFER_LIMIT = 64 * 1024
+
+    # Number of lock-table shards; must be a power of two
+    LOCK_SHARDS = 64
+
+    def __del__(self):
+        try:
+            self.flush_events()
+            if self._event_fd is not None:
+                os.close(self._event_fd)
+            if self._event_bin_fd is not None:
+                os.close(self._event_bin_fd)
+            for fd in self._dir_fds.values():
+                os.close(fd)
+        except Exception:
+            pass
+
+    def _state_path(self, client: str, invoice: str) -> Path:
+        """Return the (cached) state file path for client/invoice."""
+        key = (client, invoice)
+        path = self._path_cache.get(key)
+        if path is None:
+            path = self._path_cache[key] = self.state_dir / client / f"{invoice}.json"
+        return path
+
+    def _archive_path(self, client: str, invoice: str) -> Path:
+        """Return the (cached) archive file path for client/invoice."""
+        key = (client, invoice)
+        path = self._archive_cache.get(key)
+        if path is None:
+            path = self._archive_cache[key] = (
+                self.state_dir / "archive" / client / f"{invoice}.json")
+        return path
+
+    def _dir_fd(self, parent: Path) -> int:
+        """Return a cached O_DIRECTORY fd for fsyncing renames in parent."""
+        fd = self._dir_fds.get(parent)
+        if fd is None:
+            fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+            self._dir_fds[parent] = fd
+        return fd
+        
+    def _sync_file(self, fd: int):
+        """Flush file data per the use_fdatasync setting."""
+        if self.use_fdatasync:
+            _fdatasync(fd)
+        else:
+            os.fsync(fd)
+
     @contextmanager
     def atomic_write(self, filepath: Path) -> ContextManager:
         """
-        Write to .tmp file, then atomic replace.
-        
+        Write to an unnamed/temporary file, then atomic replace.
+
         This ensures:
         1. No partial writes visible to readers
-        2. Crash-safe: tmp file can be recovered
+        2. Crash-safe: data is fsynced before the rename publishes it
+           and the rename itself is fsynced through the parent
+           directory, so a crash can't leave a zero-length file
         3. No data corruption on system crash
-        
+
+        On Linux the temp file is an unnamed O_TMPFILE inode: it never
+        appears in the directory, and abandoning it on error is a plain
+        close with no cleanup path. Elsewhere (or on filesystems that
+        refuse O_TMPFILE) a visible .tmp file is used as before.
+
         Args:
             filepath: Final destination path
-            
+
         Yields:
             File handle for writing to temporary file
         """
         tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
-        
+
+        fd = None
+        if hasattr(os, "O_TMPFILE"):
+            try:
+                fd = os.open(filepath.parent,
+                             os.O_TMPFILE | os.O_WRONLY | os.O_CLOEXEC, 0o600)
+            except OSError:
+                fd = None  # filesystem without O_TMPFILE support
+
+        if fd is not None:
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    yield f
+                    f.flush()
+                    self._sync_file(fd)
+                    os.fchmod(fd, 0o600)
+                    # Give the inode a name via linkat, then publish it;
+                    # until the replace, readers still see the old file
+                    if tmp_path.exists():
+                        tmp_path.unlink()
+                    # dst_dir_fd forces the linkat form, which is what
+                    # dereferences the /proc fd symlink
+                    os.link(f"/proc/self/fd/{fd}", tmp_path.name,
+                            dst_dir_fd=self._dir_fd(filepath.parent),
+                            follow_symlinks=True)
+                os.replace(tmp_path, filepath)
+                os.fsync(self._dir_fd(filepath.parent))
+            except Exception:
+                # The unnamed inode is reaped by the close; only a
+                # linked-but-unpublished name needs removing
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                raise
+            return
+
         try:
             # Write to temporary file
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 yield f
-            
+                # Force the data to disk before the rename publishes it;
+                # fdatasync is enough — the rename below is what makes
+                # the file visible, and the dir fsync covers that
+                f.flush()
+                self._sync_file(f.fileno())
+
             # Set restrictive permissions
             tmp_path.chmod(0o600)
-            
+
             # Atomic replace (POSIX guarantees atomicity)
-            shutil.move(str(tmp_path), str(filepath))
-            
+            os.replace(tmp_path, filepath)
+
+            # Persist the rename; the dir fd is cached across writes
+            os.fsync(self._dir_fd(filepath.parent))
+
         except Exception as e:
             # Clean up temp file on any error
             if tmp_path.exists():
@@ -90,11 +290,9 @@ class InvoiceState:
         if not self.enable_locking:
             return True
             
-        with self._global_lock:
-            if filepath not in self._locks:
-                self._locks[filepath] = threading.Lock()
-            lock = self._locks[filepath]
-            
+        lock = self._lock_for(filepath)
+
+
         # Non-blocking lock acquire
         acquired = lock.acquire(blocking=False)
         if not acquired:
@@ -106,10 +304,37 @@ class InvoiceState:
         if not self.enable_locking:
             return
             
-        with self._global_lock:
-            if filepath in self._locks:
-                self._locks[filepath].release()
+        self._lock_for(filepath).release()
+
+    def _lock_for(self, filepath: Path) -> threading.Lock:
+        """Return the per-path lock from the path's shard table."""
+        guard, table = self._lock_shards[hash(filepath) & (self.LOCK_SHARDS - 1)]
+        with guard:
+            lock = table.get(filepath)
+            if lock is None:
+                lock = table[filepath] = threading.Lock()
+        return lock
                 
+    def _render_body(self, data: Dict[str, Any]) -> str:
+        """Render the checksummed file body for a state payload.
+
+        The canonical payload is rendered once: it is both the checksum
+        input and the file body, with the metadata fields spliced onto
+        the end instead of a second full serialization. Must stay
+        byte-identical to _compute_checksum's rendering.
+        """
+        canonical_bytes = self._canonical_bytes(data)
+        canonical = canonical_bytes.decode('utf-8')
+        checksum = xxhash.xxh3_128(canonical_bytes).hexdigest()[:16]
+        meta = (
+            f'"_checksum":"{checksum}",'
+            f'"_checksum_algo":"xxh3_128",'
+            f'"_quick_checksum":{zlib.crc32(canonical_bytes)},'
+            f'"_updated_at":"{datetime.utcnow().isoformat()}",'
+            f'"_version":"1.0"}}'
+        )
+        return ("{" if canonical == "{}" else canonical[:-1] + ",") + meta
+
     def write_state(self, client: str, invoice: str, data: Dict[str, Any]) -> Path:
         """
         Write invoice state with checksum.
@@ -125,32 +350,25 @@ class InvoiceState:
         Raises:
             StateLockError: If unable to acquire lock
         """
-        state_file = self.state_dir / client / f"{invoice}.json"
+        state_file = self._state_path(client, invoice)
         state_file.parent.mkdir(parents=True, exist_ok=True)
         
         try:
             # Acquire lock
             self._acquire_lock(state_file)
-            
-            # Compute checksum BEFORE adding metadata
-            checksum = self._compute_checksum(data)
-            
-            # Prepare state data with metadata
-            state_data = {
-                **data,
-                "_checksum": checksum,
-                "_updated_at": datetime.utcnow().isoformat(),
-                "_version": "1.0"
-            }
-            
-            # Atomic write
+
+            body = self._render_body(data)
+
+            # Atomic write; compact encoding — state files are machine
+            # read/written, pretty-print on demand with jq if needed
             with self.atomic_write(state_file) as f:
-                json.dump(state_data, f, indent=2)
+                f.write(body)
                 f.write("\n")  # Ensure trailing newline
                 
             # Append to event log
             self._log_event(client, invoice, "state_update", data)
-            
+            self.flush_events()
+
             return state_file
             
         finally:
@@ -171,20 +389,62 @@ class InvoiceState:
         Raises:
             StateCorruptionError: If checksum verification fails
         """
-        state_file = self.state_dir / client / f"{invoice}.json"
+        state_file = self._state_path(client, invoice)
         
         if not state_file.exists():
             return None
             
         try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
+            # Single os.read of a stat-sized buffer: state files are small,
+            # so this skips the buffered-I/O layer and incremental decoding
+            fd = os.open(state_file, os.O_RDONLY)
+            try:
+                st = os.fstat(fd)
+                buf = os.read(fd, st.st_size)
+            finally:
+                os.close(fd)
+            # An unchanged stat identity means these exact bytes already
+            # verified; skip the hash, not the parse
+            stat_sig = (st.st_mtime_ns, st.st_ino, st.st_size)
+            if verify_checksum and self._verify_cache.get(state_file) == stat_sig:
+                data = orjson.loads(buf)
+                data.pop("_checksum", None)
+                return data
+            if verify_checksum:
+                # Fast path: the writer controls the exact byte layout,
+                # so the checksum input is simply the bytes before the
+                # metadata splice — hash those and parse once, instead
+                # of parse + canonical re-render + hash
+                m = _META_RE.search(buf)
+                if m:
+                    residual = (buf[:m.start()] + b'}'
+                                if m.group(1) == b',' else b'{}')
+                    if m.group(3) == b'sha256':
+                        computed = hashlib.sha256(residual).hexdigest()[:16]
+                    else:
+                        computed = xxhash.xxh3_128(residual).hexdigest()[:16]
+                    if m.group(2).decode() == computed:
+                        self._verify_cache[state_file] = stat_sig
+                        data = orjson.loads(buf)
+                        data.pop("_checksum", None)
+                        return data
+                    # Mismatch: fall through to the parse-based check,
+                    # which handles unusual layouts before declaring
+                    # corruption
+
+            data = orjson.loads(buf)
+
             if verify_checksum:
                 # Extract and remove checksum
                 stored_checksum = data.pop("_checksum", None)
                 if stored_checksum:
-                    computed = self._compute_checksum(data)
+                    # Pre-switch files carry no algo marker and used sha256
+                    algo = data.get("_checksum_algo", "sha256")
+                    computed = self._compute_checksum(data, algo)
+                    if stored_checksum != computed and algo == "xxh3_128":
+                        # xxh3 files hashed before the orjson canonical
+                        # form used stdlib rendering (ASCII-escaped)
+                        computed = self._compute_checksum(data, algo, legacy=True)
                     if stored_checksum != computed:
                         # Try to recover from backup if exists
                         recovered = self._attempt_recovery(state_file)
@@ -194,7 +454,8 @@ class InvoiceState:
                             f"Checksum mismatch for {client}/{invoice}: "
                             f"stored={stored_checksum}, computed={computed}"
                         )
-                        
+                    self._verify_cache[state_file] = stat_sig
+
             return data
             
         except json.JSONDecodeError as e:
@@ -231,43 +492,43 @@ class InvoiceState:
         Returns:
             Path to archived state file
         """
-        state_file = self.state_dir / client / f"{invoice}.json"
+        state_file = self._state_path(client, invoice)
         
         if not state_file.exists():
             raise FileNotFoundError(f"State file not found: {state_file}")
             
         try:
             self._acquire_lock(state_file)
-            
+
             # Read current state
             data = self.read_state(client, invoice)
-            
+
             # Update status
             data["status"] = "paid"
             data["paid_at"] = datetime.utcnow().isoformat()
             data["payment"] = payment_data
-            
-            self.write_state(client, invoice, data)
-            
-            # Move to archive
-            archive_dir = self.state_dir / "archive" / client
-            archive_dir.mkdir(parents=True, exist_ok=True)
-            
-            archive_file = archive_dir / f"{invoice}.json"
-            
-            # Copy to archive with atomic write
+
+            # Fast path: render once and write straight to the archive
+            # location, instead of rewriting the live state file only to
+            # rename it away — one parse, one serialize, one publish
+            archive_file = self._archive_path(client, invoice)
+            archive_file.parent.mkdir(parents=True, exist_ok=True)
+
+            body = self._render_body(data)
             with self.atomic_write(archive_file) as f:
-                json.dump(data, f, indent=2)
+                f.write(body)
                 f.write("\n")
-                
-            # Remove original (after successful archive)
-            state_file.unlink()
-            
+
+            os.unlink(state_file)
+            self._path_cache.pop((client, invoice), None)
+            self._verify_cache.pop(state_file, None)
+
             # Log payment
             self._log_event(client, invoice, "paid", payment_data)
-            
+            self.flush_events()
+
             return archive_file
-            
+
         finally:
             self._release_lock(state_file)
             
@@ -282,7 +543,7 @@ class InvoiceState:
         Returns:
             Path to backup file
         """
-        state_file = self.state_dir / client / f"{invoice}.json"
+        state_file = self._state_path(client, invoice)
         
         if not state_file.exists():
             raise FileNotFoundError(f"State file not found: {state_file}")
@@ -292,29 +553,50 @@ class InvoiceState:
         
         return backup_file
         
-    def _compute_checksum(self, data: Dict[str, Any]) -> str:
+    @staticmethod
+    def _canonical_bytes(data: Dict[str, Any], legacy: bool = False) -> bytes:
         """
-        Compute SHA-256 checksum of data.
-        
-        Uses canonical JSON representation (sorted keys) for consistent hashing.
+        Render the checksum-canonical form: non-metadata fields, sorted
+        keys, compact separators. orjson emits UTF-8 bytes directly; the
+        legacy flag reproduces the stdlib (ASCII-escaped) rendering used
+        by older files.
+        """
+        payload = {k: v for k, v in data.items() if not k.startswith("_")}
+        if legacy:
+            return json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+
+    def _compute_checksum(self, data: Dict[str, Any], algo: str = "xxh3_128",
+                          legacy: bool = False) -> str:
         """
-        # Remove metadata fields before computing checksum
-        data_copy = {k: v for k, v in data.items() if not k.startswith("_")}
-        content = json.dumps(data_copy, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        Compute integrity checksum of data.
+
+        New writes use xxh3_128 - these are integrity checks on local
+        files, not a defense against attackers, and xxh3 is an order of
+        magnitude faster on small payloads. Files written before the
+        switch verify through the sha256 branch, which always uses the
+        stdlib canonical rendering of its era.
+        """
+        if algo == "sha256":
+            return hashlib.sha256(
+                self._canonical_bytes(data, legacy=True)).hexdigest()[:16]
+        return xxhash.xxh3_128(
+            self._canonical_bytes(data, legacy=legacy)).hexdigest()[:16]
         
     def _log_event(self, client: str, invoice: str, event_type: str, data: Any):
         """
         Append-only event log for audit trail.
-        
+
         Each event is a single line of JSON, making it:
         - Append-only (no overwrites)
         - Human-readable
         - Easy to parse and replay
         - Crash-safe (always valid)
+
+        Events are buffered and written in batches; every public
+        operation flushes before returning, so readers always see a
+        complete log between calls.
         """
-        log_file = self.state_dir / "events.log"
-        
         entry = {
             "timestamp": datetime.utcnow().isoformat(),
             "event_id": self._generate_event_id(),
@@ -323,34 +605,38 @@ class InvoiceState:
             "event": event_type,
             "data": data
         }
-        
-        # Atomic append (write+flush+rename for safety)
-        tmp_log = log_file.with_suffix(log_file.suffix + ".tmp")
-        
-        try:
-            # Read existing if present
-            existing = ""
-            if log_file.exists():
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    existing = f.read()
-                    
-            # Write original + new entry
-            with open(tmp_log, 'w', encoding='utf-8') as f:
-                if existing:
-                    f.write(existing)
-                    if not existing.endswith("\n"):
-                        f.write("\n")
-                f.write(json.dumps(entry) + "\n")
-                f.flush()
-                os.fsync(f.fileno())
-                
-            # Atomic replace
-            shutil.move(str(tmp_log), str(log_file))
-            
-        except Exception as e:
-            if tmp_log.exists():
-                tmp_log.unlink()
-            raise Exception(f"Failed to append to event log: {e}")
+
+        line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+        with self._event_lock:
+            self._event_buf.append(line)
+            self._event_buf_bytes += len(line)
+            if self.fast_replay:
+                self._event_bin_buf.append(struct.pack('<I', len(line)) + line)
+            if self._event_buf_bytes >= self.EVENT_BUFFER_LIMIT:
+                self._flush_events_locked()
+
+    def flush_events(self):
+        """Write any buffered events to events.log."""
+        with self._event_lock:
+            self._flush_events_locked()
+
+    def _flush_events_locked(self):
+        """Single os.write of the joined buffer; caller holds the lock."""
+        if not self._event_buf:
+            return
+        if self._event_fd is None:
+            self._event_fd = os.open(
+                self._event_log, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        os.write(self._event_fd, b"".join(self._event_buf))
+        self._event_buf.clear()
+        self._event_buf_bytes = 0
+        if self._event_bin_buf:
+            if self._event_bin_fd is None:
+                self._event_bin_fd = os.open(
+                    self._event_bin,
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            os.write(self._event_bin_fd, b"".join(self._event_bin_buf))
+            self._event_bin_buf.clear()
             
     def _generate_event_id(self) -> str:
         """Generate unique event ID."""
@@ -367,29 +653,82 @@ class InvoiceState:
         Returns:
             List of event dictionaries
         """
-        log_file = self.state_dir / "events.log"
-        
+        log_file = self._event_log
+
         if not log_file.exists():
             return []
-            
+
         events = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                try:
-                    event = json.loads(line)
+        # mmap + bytes.find walks the log without per-line str decode or
+        # Python-level line iteration; slices feed orjson directly
+        with open(log_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                size = len(mm)
+                start = 0
+                while start < size:
+                    nl = mm.find(b'\n', start)
+                    if nl == -1:
+                        nl = size
+                    line = mm[start:nl]
+                    start = nl + 1
+                    if not line.strip():
+                        continue
+
+                    try:
+                        event = orjson.loads(line)
+                        if since_timestamp and event["timestamp"] < since_timestamp:
+                            continue
+                        events.append(event)
+                    except json.JSONDecodeError:
+                        # Skip corrupted lines
+                        continue
+            finally:
+                mm.close()
+
+        return events
+
+    def replay_events_fast(self, since_timestamp: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Replay events from the binary sidecar (requires fast_replay).
+
+        Records are length-prefixed, so replay jumps record to record
+        with struct.unpack_from instead of scanning for newlines. Falls
+        back to replay_events when no sidecar exists (e.g. events were
+        written before fast_replay was enabled).
+        """
+        if not self._event_bin.exists():
+            return self.replay_events(since_timestamp)
+
+        events = []
+        with open(self._event_bin, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                size = len(mm)
+                off = 0
+                while off + 4 <= size:
+                    (length,) = struct.unpack_from('<I', mm, off)
+                    off += 4
+                    if off + length > size:
+                        break  # truncated tail record
+                    event = orjson.loads(mm[off:off + length])
+                    off += length
                     if since_timestamp and event["timestamp"] < since_timestamp:
                         continue
                     events.append(event)
-                except json.JSONDecodeError:
-                    # Skip corrupted lines
-                    continue
-                    
+            finally:
+                mm.close()
+
         return events
-        
+
     def get_event_count(self) -> int:
         """Get total number of events in log."""
         log_file = self.state_dir / "events.log"
@@ -402,18 +741,69 @@ class InvoiceState:
                 count += 1
         return count
         
-    def verify_integrity(self, client: str, invoice: str) -> Tuple[bool, str]:
+    def verify_integrity(self, client: str, invoice: str,
+                         quick: bool = False) -> Tuple[bool, str]:
         """
         Verify state file integrity.
-        
+
+        Args:
+            quick: Check only the CRC32 quick checksum when the file
+                carries one. CRC32 is hardware-accelerated and plenty
+                for did-anything-change scans; the 128-bit checksum
+                stays the verdict for files without the field.
+
         Returns:
             Tuple of (is_valid, message)
         """
-        state_file = self.state_dir / client / f"{invoice}.json"
-        
-        if not state_file.exists():
+        state_file = self._state_path(client, invoice)
+
+        try:
+            st = state_file.stat()
+        except OSError:
             return False, f"State file not found: {state_file}"
-            
+        stat_sig = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if self._verify_cache.get(state_file) == stat_sig:
+            return True, f"State file {client}/{invoice} is valid (cached)"
+
+        if quick:
+            try:
+                with open(state_file, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    mm = None
+                    if size >= _MMAP_VERIFY_THRESHOLD:
+                        # Hash straight from the page cache: crc32 takes
+                        # buffer-protocol views, so no read() copy
+                        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        if hasattr(mm, "madvise"):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        buf = mm
+                    else:
+                        buf = f.read()
+                    try:
+                        m = _META_RE.search(buf)
+                        mq = _QUICK_RE.search(buf, m.end()) if m else None
+                        if m and mq:
+                            stored_crc = int(mq.group(1))
+                            if m.group(1) == b',':
+                                computed_crc = zlib.crc32(
+                                    memoryview(buf)[:m.start()])
+                                computed_crc = zlib.crc32(b'}', computed_crc)
+                            else:
+                                computed_crc = zlib.crc32(b'{}')
+                            if stored_crc == computed_crc:
+                                self._verify_cache[state_file] = stat_sig
+                                return True, f"State file {client}/{invoice} is valid"
+                            return False, (
+                                f"CRC32 mismatch for {client}/{invoice}: "
+                                f"stored={stored_crc}, computed={computed_crc}"
+                            )
+                        # No splice/CRC field: full check below decides
+                    finally:
+                        if mm is not None:
+                            mm.close()
+            except Exception as e:
+                return False, f"Read error: {e}"
+
         try:
             data = self.read_state(client, invoice, verify_checksum=True)
             return True, f"State file {client}/{invoice} is valid"
@@ -422,26 +812,38 @@ class InvoiceState:
         except Exception as e:
             return False, f"Read error: {e}"
             
-    def list_all_states(self) -> List[Dict[str, Any]]:
-        """List all state files with integrity status."""
-        states = []
-        
-        for client_dir in self.state_dir.iterdir():
-            if not client_dir.is_dir() or client_dir.name.startswith("."):
+    def _verify_entry(self, entry: Tuple[str, str, str]) -> Tuple[bool, str]:
+        """Verify one (client, invoice, path) tuple for list_all_states."""
+        return self.verify_integrity(entry[0], entry[1], quick=True)
+
+    def list_all_states(self) -> StateListing:
+        """List all state files with integrity status.
+
+        Enumeration uses os.scandir and verification fans out to a
+        thread pool on larger trees: each check is dominated by the
+        file read, so overlapping the syscalls hides most of the I/O.
+        Results come back as a columnar StateListing that iterates and
+        indexes like the old list of dicts.
+        """
+        entries = []
+        for client_entry in os.scandir(self.state_dir):
+            if not client_entry.is_dir(follow_symlinks=False) or \
+                    client_entry.name.startswith("."):
                 continue
-                
-            client = client_dir.name
-            
-            for state_file in client_dir.glob("*.json"):
-                invoice = state_file.stem
-                is_valid, message = self.verify_integrity(client, invoice)
-                
-                states.append({
-                    "client": client,
-                    "invoice": invoice,
-                    "valid": is_valid,
-                    "message": message,
-                    "path": str(state_file)
-                })
-                
-        return states
\ No newline at end of file
+            client = client_entry.name
+            for state_entry in os.scandir(client_entry.path):
+                name = state_entry.name
+                if name.endswith(".json") and state_entry.is_file():
+                    entries.append((client, name[:-5], state_entry.path))
+
+        if len(entries) > _PARALLEL_VERIFY_THRESHOLD:
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(self._verify_entry, entries))
+        else:
+            results = [self._verify_entry(e) for e in entries]
+
+        listing = StateListing()
+        for (client, invoice, path), (is_valid, message) in zip(entries, results):
+            listing._append(client, invoice, is_valid, message, path)
+        return listing
\ No newline at end of file
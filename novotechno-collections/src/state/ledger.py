@@ -3,12 +3,93 @@ QMD Ledger Implementation
 Project: PROJ-2026-0210-novotechno-collections
 """
 
+import functools
+import mmap
+import os
+import sys
 import re
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+
+import orjson
+import threading
+
+# Optional: Bloom-filter pre-check for very large ledgers
+try:
+    from pybloom_live import BloomFilter
+except ImportError:
+    BloomFilter = None
+
+# Optional: vectorized reconcile summation for large state dirs
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this many parsed files the plain Python loop wins
+_VECTORIZE_THRESHOLD = 1000
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Any
 
+@functools.cache
+def _patterns() -> Dict[str, "re.Pattern"]:
+    """Compile ledger regexes on first use.
+
+    Compiled once and cached (the interpreter-wide re cache can be evicted
+    by other modules), but lazily, so CLI tools that never touch the ledger
+    don't pay regex compilation at import time.
+    """
+    return {
+        "summary": re.compile(r'## Summary\s+(.*?)(?=\n##|$)', re.DOTALL),
+    }
+
+
+def _iter_state_files(root):
+    """Yield non-archive .json paths under root, pruning archive dirs."""
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != "archive":
+                yield from _iter_state_files(entry.path)
+        elif entry.name.endswith(".json"):
+            yield entry.path
+
+
+def _load_state_file(path):
+    """Read and decode one state file; errors are returned, not raised."""
+    try:
+        with open(path, 'rb') as f:
+            return path, orjson.loads(f.read()), None
+    except Exception as e:
+        return path, None, e
+
+
+# Below this many files a serial loop beats thread-pool startup cost
+_PARALLEL_READ_THRESHOLD = 64
+
+# Above this many files JSON decode dominates and is worth forking for
+_PROCESS_POOL_THRESHOLD = 1000
+
+
+def _read_state_files(paths):
+    """Read many small state files with overlapping I/O.
+
+    Serial open/read leaves the disk queue at depth 1; a thread pool keeps
+    many reads in flight. (io_uring batch submission would go further on
+    Linux but needs a native binding; threads are portable and close.)
+    For very large dirs the bottleneck shifts to GIL-bound Python object
+    construction during decode, so those fan out to worker processes with
+    a chunksize big enough to amortize the IPC.
+    """
+    if len(paths) > _PROCESS_POOL_THRESHOLD:
+        with ProcessPoolExecutor() as ex:
+            return list(ex.map(_load_state_file, paths, chunksize=256))
+    if len(paths) > _PARALLEL_READ_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=32) as ex:
+            return list(ex.map(_load_state_file, paths))
+    return [_load_state_file(p) for p in paths]
+
 
 class LedgerError(Exception):
     """Raised for ledger-related errors."""
@@ -32,23 +113,43 @@ class Ledger:
     - Transaction history tracking
     """
     
-    def __init__(self, ledger_path: str, create_if_missing: bool = True):
+    # Flush a journal group early once it holds this many records
+    JOURNAL_HIGH_WATER = 256
+
+    def __init__(self, ledger_path: str, create_if_missing: bool = True,
+                 group_commit_ms: int = 0):
         """
         Initialize ledger.
-        
+
         Args:
             ledger_path: Path to ledger file
             create_if_missing: Create if doesn't exist
+            group_commit_ms: Journal group-commit window in milliseconds.
+                0 (default) appends journal records synchronously; a
+                positive value batches records for up to this long and
+                issues one write + fdatasync per group, so bursts of
+                mutations aren't serialized on per-append disk commits.
         """
         self.ledger_path = Path(ledger_path)
         self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        self.group_commit_ms = group_commit_ms
+        self._journal_buf = deque()
+        self._journal_cond = threading.Condition()
+        self._journal_thread = None
+        self._journal_closed = False
+        self._journal_writing = False
         
         if create_if_missing and not self.ledger_path.exists():
             self._create_initial()
-            
-        self._totals = {"unpaid": 0.0, "paid": 0.0, "escalated": 0.0}
+
+        # Totals in integer cents: float accumulation drifts under repeated
+        # adds/subtracts and eventually disagrees with the rendered values
+        self._totals = {"unpaid": 0, "paid": 0, "escalated": 0}
+        self._summary_cache = None
+        self._summary_dirty = True
         self._load_totals()
-        
+        self._load_sections()
+
     def _create_initial(self):
         """Create initial ledger structure."""
         content = """# Collections Ledger
@@ -65,9 +166,14 @@ class Ledger:
 - **Escalated Total:** $0.00
 - **Grand Total:** $0.00
 """
-        with open(self.ledger_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
+        self._atomic_write(content)
+
+    def _atomic_write(self, data: str):
+        """Write via tmp file + os.replace so a crash never truncates."""
+        tmp = self.ledger_path.with_name(self.ledger_path.name + '.tmp')
+        tmp.write_text(data, encoding='utf-8')
+        os.replace(tmp, self.ledger_path)
+
     def _load_totals(self):
         """Load running totals from ledger."""
         try:
@@ -76,27 +182,151 @@ class Ledger:
                 
             content = self.ledger_path.read_text(encoding='utf-8')
             
-            # Parse summary section
-            summary_match = re.search(r'## Summary\s+(.*?)(?=\n##|$)', content, re.DOTALL)
+            # Parse summary section in a single line-structured pass
+            summary_match = _patterns()["summary"].search(content)
             if summary_match:
-                summary = summary_match.group(1)
-                
-                # Extract totals
-                unpaid_match = re.search(r'Unpaid Total.*?\$([\d,]+\.?\d*)', summary)
-                if unpaid_match:
-                    self._totals["unpaid"] = float(unpaid_match.group(1).replace(',', ''))
-                    
-                paid_match = re.search(r'Paid Total.*?\$([\d,]+\.?\d*)', summary)
-                if paid_match:
-                    self._totals["paid"] = float(paid_match.group(1).replace(',', ''))
-                    
-                escalated_match = re.search(r'Escalated Total.*?\$([\d,]+\.?\d*)', summary)
-                if escalated_match:
-                    self._totals["escalated"] = float(escalated_match.group(1).replace(',', ''))
+                for line in summary_match.group(1).splitlines():
+                    line = line.strip()
+                    if line.startswith("- **Unpaid Total:"):
+                        self._totals["unpaid"] = round(float(line.rsplit('$', 1)[1].replace(',', '')) * 100)
+                    elif line.startswith("- **Paid Total:"):
+                        self._totals["paid"] = round(float(line.rsplit('$', 1)[1].replace(',', '')) * 100)
+                    elif line.startswith("- **Escalated Total:"):
+                        self._totals["escalated"] = round(float(line.rsplit('$', 1)[1].replace(',', '')) * 100)
                     
         except Exception as e:
             raise LedgerParseError(f"Failed to parse ledger: {e}")
-            
+
+    def _load_sections(self):
+        """Parse the ledger once into in-memory section line lists."""
+        self._preamble = []
+        self._section_order = []
+        self._section_titles = {}
+        self._section_lines = {}
+        self._index = {}  # invoice_number -> section name, O(1) membership
+        # Bloom pre-check rejects definite non-members from an L1-sized
+        # bitset before the dict probe; only useful at large scale
+        self._bloom = BloomFilter(capacity=100_000, error_rate=0.001) if BloomFilter else None
+
+        if not self.ledger_path.exists():
+            return
+
+        content = self.ledger_path.read_text(encoding='utf-8')
+        current = None
+
+        for line in content.split('\n'):
+            if line.startswith("## "):
+                title = line[3:].strip()
+                current = title.lower()
+                self._section_order.append(current)
+                self._section_titles[current] = title
+                self._section_lines[current] = deque()
+            elif current is None:
+                self._preamble.append(line)
+            elif line.strip():
+                self._section_lines[current].append(line)
+                invoice_num = self._entry_invoice(line)
+                if invoice_num:
+                    # Interned keys make dict probes pointer compares in
+                    # the hot add/mark loops
+                    self._index[sys.intern(invoice_num)] = sys.intern(current)
+                    self._bloom_add(invoice_num)
+
+        # Drop trailing blank preamble lines; _render re-adds the separator
+        while self._preamble and not self._preamble[-1].strip():
+            self._preamble.pop()
+
+    @staticmethod
+    def _entry_invoice(line: str) -> Optional[str]:
+        """Extract the backtick-quoted invoice number from an entry line."""
+        start = line.find('`')
+        if start == -1:
+            return None
+        end = line.find('`', start + 1)
+        if end == -1:
+            return None
+        return line[start + 1:end]
+
+    def _journal(self, op: Dict[str, Any]):
+        """Append a mutation record to the append-only journal."""
+        op["ts"] = datetime.utcnow().isoformat()
+        line = json.dumps(op).encode('utf-8') + b"\n"
+        if self.group_commit_ms <= 0:
+            with open(self._journal_path(), 'ab') as f:
+                f.write(line)
+            return
+        with self._journal_cond:
+            if self._journal_thread is None:
+                self._journal_thread = threading.Thread(
+                    target=self._journal_writer, daemon=True)
+                self._journal_thread.start()
+            self._journal_buf.append(line)
+            if len(self._journal_buf) >= self.JOURNAL_HIGH_WATER:
+                self._journal_cond.notify()
+
+    def _journal_path(self) -> Path:
+        return self.ledger_path.with_suffix('.jrnl')
+
+    def _journal_writer(self):
+        """Group-commit loop: one write + fdatasync per batch of records."""
+        window = self.group_commit_ms / 1000.0
+        while True:
+            with self._journal_cond:
+                while not self._journal_buf and not self._journal_closed:
+                    self._journal_cond.wait()
+                if self._journal_closed and not self._journal_buf:
+                    return
+                # Let the commit window fill before draining
+                self._journal_cond.wait(timeout=window)
+                batch = b"".join(self._journal_buf)
+                self._journal_buf.clear()
+                self._journal_writing = True
+            with open(self._journal_path(), 'ab') as f:
+                f.write(batch)
+                getattr(os, "fdatasync", os.fsync)(f.fileno())
+            with self._journal_cond:
+                self._journal_writing = False
+                self._journal_cond.notify_all()
+
+    def flush_journal(self):
+        """Block until all buffered journal records are on disk."""
+        if self.group_commit_ms <= 0:
+            return
+        with self._journal_cond:
+            self._journal_cond.notify()
+            while self._journal_buf or self._journal_writing:
+                self._journal_cond.wait()
+
+    def close(self):
+        """Flush and stop the group-commit writer, if running."""
+        if self._journal_thread is None:
+            return
+        self.flush_journal()
+        with self._journal_cond:
+            self._journal_closed = True
+            self._journal_cond.notify_all()
+        self._journal_thread.join(timeout=1.0)
+        self._journal_thread = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _render(self) -> str:
+        """Rebuild the QMD document from the in-memory sections."""
+        parts = list(self._preamble) + ['']
+        for name in self._section_order:
+            parts.append(f"## {self._section_titles[name]}")
+            parts.extend(self._section_lines[name])
+            parts.append('')
+        return '\n'.join(parts)
+
+    def _flush(self):
+        """Write the rendered ledger back to disk in one atomic pass."""
+        self._atomic_write(self._render())
+
     def add_invoice(self, invoice_data: Dict[str, Any]) -> bool:
         """
         Add invoice to unpaid section.
@@ -110,31 +340,55 @@ class Ledger:
         Raises:
             LedgerError: If invoice already exists
         """
+        return self.add_invoices([invoice_data])
+
+    def add_invoices(self, invoices: List[Dict[str, Any]]) -> bool:
+        """
+        Add multiple invoices to the unpaid section with a single write.
+
+        The whole batch is validated up front; nothing is written unless
+        every invoice is valid.
+
+        Args:
+            invoices: List of invoice dictionaries
+
+        Returns:
+            True if all invoices were added
+
+        Raises:
+            LedgerError: If any invoice is invalid or already exists
+        """
         required = ['invoice_number', 'amount', 'client_name']
-        if not all(k in invoice_data for k in required):
-            raise LedgerError(f"Missing required fields: {required}")
-            
-        invoice_num = invoice_data['invoice_number']
-        amount = invoice_data['amount']
-        client = invoice_data['client_name']
-        due_date = invoice_data.get('due_date', '')
-        
-        # Check if already exists anywhere in ledger
-        if self._invoice_exists(invoice_num):
-            raise LedgerError(f"Invoice {invoice_num} already exists in ledger")
-            
-        # Build entry
-        entry = f"- `{invoice_num}` | ${amount:,.2f} | {client}"
-        if due_date:
-            entry += f" | Due: {due_date}"
-        entry += " | Status: unpaid"
-        
-        # Add to unpaid section
-        self._append_to_section("## Unpaid", entry)
-        
-        # Update totals
-        self._update_totals("unpaid", amount)
-        
+        seen = set()
+
+        for invoice_data in invoices:
+            if not all(k in invoice_data for k in required):
+                raise LedgerError(f"Missing required fields: {required}")
+
+            invoice_num = invoice_data['invoice_number']
+            if self._invoice_exists(invoice_num) or invoice_num in seen:
+                raise LedgerError(f"Invoice {invoice_num} already exists in ledger")
+            seen.add(invoice_num)
+
+        for invoice_data in invoices:
+            invoice_num = invoice_data['invoice_number']
+            amount = invoice_data['amount']
+            client = invoice_data['client_name']
+            due_date = invoice_data.get('due_date', '')
+
+            # Build entry
+            entry = f"- `{invoice_num}` | ${amount:,.2f} | {client}"
+            if due_date:
+                entry += f" | Due: {due_date}"
+            entry += " | Status: unpaid"
+
+            # Add to unpaid section
+            self._append_to_section("## Unpaid", entry)
+
+            # Update totals
+            self._update_totals("unpaid", amount)
+
+        self._flush()
         return True
         
     def mark_paid(self, invoice_number: str, amount: float, 
@@ -168,11 +422,12 @@ class Ledger:
         
         # Add to paid section
         self._append_to_section("## Paid", entry)
-        
+
         # Update totals
         self._update_totals("unpaid", -amount)
         self._update_totals("paid", amount)
-        
+
+        self._flush()
         return True
         
     def escalate(self, invoice_number: str, amount: float, 
@@ -200,11 +455,12 @@ class Ledger:
         
         # Add to escalated section
         self._append_to_section("## Escalated", entry)
-        
+
         # Update totals
         self._update_totals("unpaid", -amount)
         self._update_totals("escalated", amount)
-        
+
+        self._flush()
         return True
         
     def reconcile(self, state_dir: str, auto_fix: bool = False) -> Dict[str, Any]:
@@ -218,35 +474,43 @@ class Ledger:
         Returns:
             Dict with reconciliation results
         """
-        from pathlib import Path
-        
         state_path = Path(state_dir)
         if not state_path.exists():
             raise LedgerError(f"State directory not found: {state_dir}")
-            
-        # Sum unpaid invoices from state files
+
+        # Sum unpaid invoices from state files; scandir walk avoids the
+        # extra stat calls of rglob and prunes archive dirs up front
         state_total = 0.0
         state_count = 0
-        
-        unpaid_files = list(state_path.rglob("*.json"))
-        
-        for state_file in unpaid_files:
-            if state_file.parent.name == "archive":
-                continue
-                
-            try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                if data.get("status") in ["unpaid", "pending"]:
-                    amount = data.get("amount", 0)
-                    if isinstance(amount, (int, float)):
-                        state_total += amount
-                        state_count += 1
-            except Exception as e:
+
+        unpaid_files = list(_iter_state_files(state_path))
+        parsed = []
+
+        for state_file, data, error in _read_state_files(unpaid_files):
+            if error is not None:
                 if not auto_fix:
-                    raise LedgerError(f"Error reading {state_file}: {e}")
-                    
+                    raise LedgerError(f"Error reading {state_file}: {error}")
+                continue
+
+            parsed.append((state_file, data))
+
+        unpaid_amounts = (
+            data.get("amount", 0) for _, data in parsed
+            if data.get("status") in ["unpaid", "pending"]
+            and isinstance(data.get("amount", 0), (int, float))
+        )
+
+        if np is not None and len(parsed) > _VECTORIZE_THRESHOLD:
+            # SIMD summation beats the bytecode loop once dirs get large
+            amounts = np.fromiter(unpaid_amounts, dtype=np.float64)
+            state_total = float(amounts.sum())
+            state_count = int(amounts.size)
+        else:
+            for amount in unpaid_amounts:
+                state_total += amount
+                state_count += 1
+
+
         # Compare with ledger
         ledger_summary = self.get_summary()
         ledger_total = ledger_summary["unpaid_total"]
@@ -265,19 +529,24 @@ class Ledger:
         
         if auto_fix and not passed:
             # Remove invalid entries from ledger
-            self._fix_discrepancies(unpaid_files)
+            self._fix_discrepancies(parsed)
             result["auto_fixed"] = True
             
         return result
         
     def get_summary(self) -> Dict[str, Any]:
-        """Get ledger summary with totals."""
-        return {
-            "unpaid_total": self._totals["unpaid"],
-            "paid_total": self._totals["paid"],
-            "escalated_total": self._totals["escalated"],
-            "grand_total": sum(self._totals.values())
+        """Get ledger summary with totals (cached until totals change)."""
+        if not self._summary_dirty:
+            return self._summary_cache
+
+        self._summary_cache = {
+            "unpaid_total": self._totals["unpaid"] / 100,
+            "paid_total": self._totals["paid"] / 100,
+            "escalated_total": self._totals["escalated"] / 100,
+            "grand_total": sum(self._totals.values()) / 100
         }
+        self._summary_dirty = False
+        return self._summary_cache
         
     def get_all_unpaid(self) -> List[Dict[str, Any]]:
         """
@@ -289,37 +558,54 @@ class Ledger:
         unpaid_invoices = []
         
         try:
-            content = self.ledger_path.read_text(encoding='utf-8')
-            
-            # Find unpaid section
-            unpaid_match = re.search(r'## Unpaid\s+(.+?)(?=\n##|\Z)', content, re.DOTALL)
-            if not unpaid_match:
-                return unpaid_invoices
-                
-            unpaid_section = unpaid_match.group(1)
-            
+            # mmap + bytes find: locate the unpaid section against the
+            # kernel page cache and decode only that slice, instead of
+            # copying and decoding the whole file
+            with open(self.ledger_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return unpaid_invoices
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    start = mm.find(b'## Unpaid')
+                    if start == -1:
+                        return unpaid_invoices
+                    start = mm.find(b'\n', start)
+                    if start == -1:
+                        return unpaid_invoices
+                    end = mm.find(b'\n##', start)
+                    unpaid_section = mm[start:end if end != -1 else mm.size()].decode('utf-8')
+
+            # Loop-invariant default: utcnow().isoformat() allocates and
+            # formats, no need to repeat it per entry
+            default_due = datetime.utcnow().isoformat()
+
             # Parse each line in unpaid section
             for line in unpaid_section.split('\n'):
                 line = line.strip()
-                if not line or not line.startswith('- '):
+                if not line.startswith('- '):
                     continue
-                    
-                # Parse invoice entry
+
+                # Parse invoice entry by splitting on the field separator —
+                # guaranteed O(n), no regex backtracking on odd client names
                 # Format: `- `INV-001` | $1,000.00 | Client Name | Due: 2023-12-31 | Status: unpaid`
-                match = re.search(r'- `([^`]+)` \| \$([\d,]+\.?\d*) \| ([^|]+)(?: \| Due: ([^|]+))?', line)
-                if match:
-                    invoice_number = match.group(1)
-                    amount = float(match.group(2).replace(',', ''))
-                    client_name = match.group(3).strip()
-                    due_date = match.group(4) or datetime.utcnow().isoformat()
-                    
-                    unpaid_invoices.append({
-                        "invoice_number": invoice_number,
-                        "amount": amount,
-                        "client_name": client_name,
-                        "due_date": due_date,
-                        "email": "unknown@example.com"  # Default if not specified
-                    })
+                parts = [p.strip() for p in line[2:].split(' | ')]
+                if len(parts) < 3:
+                    continue
+
+                try:
+                    amount = float(parts[1].lstrip('$').replace(',', ''))
+                except ValueError:
+                    continue
+
+                due_date = next((p[5:] for p in parts[3:] if p.startswith('Due: ')), None)
+
+                unpaid_invoices.append({
+                    "invoice_number": parts[0].strip('`'),
+                    "amount": amount,
+                    "client_name": parts[2],
+                    "due_date": due_date or default_due,
+                    "email": "unknown@example.com"  # Default if not specified
+                })
                     
         except Exception as e:
             # Log error but return empty list rather than crashing
@@ -351,134 +637,104 @@ class Ledger:
         }
         
         output = Path(output_path)
-        with open(output, 'w', encoding='utf-8') as f:
-            json.dump(export, f, indent=2)
-            
+        with open(output, 'wb') as f:
+            f.write(orjson.dumps(export, option=orjson.OPT_INDENT_2))
+
         return output
         
+    def _bloom_add(self, invoice_number: str):
+        """Record invoice in the Bloom filter, disabling it when full."""
+        if self._bloom is None:
+            return
+        try:
+            self._bloom.add(invoice_number)
+        except IndexError:
+            # Capacity exceeded; the dict remains authoritative
+            self._bloom = None
+
     def _invoice_exists(self, invoice_number: str) -> bool:
         """Check if invoice exists anywhere in ledger."""
-        content = self.ledger_path.read_text(encoding='utf-8')
-        return f"`{invoice_number}`" in content
+        if self._bloom is not None and invoice_number not in self._bloom:
+            return False
+        return invoice_number in self._index
         
     def _append_to_section(self, section_header: str, entry: str):
-        """Append entry to specific section."""
-        with open(self.ledger_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Find section and append 
-        lines = content.split('\n')
-        section_idx = None
-        next_section_idx = None
-        
-        for i, line in enumerate(lines):
-            if line.strip() == section_header:
-                section_idx = i
-            elif section_idx is not None and line.startswith("## "):
-                next_section_idx = i
-                break
-                
-        if section_idx is None:
+        """Prepend entry to specific section (newest first)."""
+        section = section_header[3:].lower()
+
+        if section not in self._section_lines:
             raise LedgerError(f"Section {section_header} not found")
-            
-        # Insert after section header (skip one line for content)
-        insert_at = section_idx + 2 if next_section_idx is None else min(section_idx + 2, next_section_idx)
-        lines.insert(insert_at, entry)
-        
-        with open(self.ledger_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-            
+
+        # O(1) appendleft: list.insert(0, ...) shifts every element
+        self._section_lines[section].appendleft(entry)
+        invoice_num = self._entry_invoice(entry)
+        if invoice_num:
+            self._index[sys.intern(invoice_num)] = sys.intern(section)
+            self._bloom_add(invoice_num)
+        self._journal({"op": "append", "section": section, "entry": entry})
+
     def _remove_from_unpaid(self, invoice_number: str) -> bool:
         """Remove invoice from unpaid section."""
-        with open(self.ledger_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        lines = content.split('\n')
-        unpaid_start = None
-        unpaid_end = None
-        
-        for i, line in enumerate(lines):
-            if line.strip() == "## Unpaid":
-                unpaid_start = i
-            elif unpaid_start is not None and line.startswith("## "):
-                unpaid_end = i
-                break
-                
-        if unpaid_start is None:
+        lines = self._section_lines.get("unpaid")
+        if lines is None:
             return False
-            
-        # Find and remove the invoice
-        found = False
-        unpaid_end = unpaid_end if unpaid_end else len(lines)
-        
-        for i in range(unpaid_start, unpaid_end):
-            if f"`{invoice_number}`" in lines[i]:
-                lines.pop(i)
-                found = True
-                break
-                
-        if found:
-            with open(self.ledger_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(lines))
-                
-        return found
-        
+
+        marker = f"`{invoice_number}`"
+        for i, line in enumerate(lines):
+            if marker in line:
+                del lines[i]
+                if self._index.get(invoice_number) == "unpaid":
+                    del self._index[invoice_number]
+                self._journal({"op": "remove", "section": "unpaid",
+                               "invoice": invoice_number})
+                return True
+
+        return False
+
+    def _render_summary_lines(self) -> List[str]:
+        """Render the Summary section from in-memory totals."""
+        return [
+            f"- **Unpaid Total:** ${self._totals['unpaid'] / 100:,.2f}",
+            f"- **Paid Total:** ${self._totals['paid'] / 100:,.2f}",
+            f"- **Escalated Total:** ${self._totals['escalated'] / 100:,.2f}",
+            f"- **Grand Total:** ${sum(self._totals.values()) / 100:,.2f}",
+        ]
+
     def _update_totals(self, section: str, amount: float):
         """Update running totals in summary section."""
         section = section.lower()
         if section not in self._totals:
             return
-            
-        self._totals[section] += amount
-        
-        # Update summary section
-        with open(self.ledger_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Update individual total
-        old_total = f"**{section.title()} Total:** ${self._totals[section] - amount:.2f}"
-        new_total = f"**{section.title()} Total:** ${self._totals[section]:.2f}"
-        content = content.replace(old_total, new_total)
-        
-        # Update grand total
-        old_grand = f"**Grand Total:** ${sum([self._totals[s] for s in self._totals]) - amount:.2f}"
-        new_grand = f"**Grand Total:** ${sum(self._totals.values()):.2f}"
-        content = content.replace(old_grand, new_grand)
-        
-        with open(self.ledger_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
-    def _fix_discrepancies(self, unpaid_files: List[Path]):
-        """Fix discrepancies between ledger and state files."""
-        # Remove entries that don't have corresponding state files
+
+        self._totals[section] += round(amount * 100)
+        self._summary_dirty = True
+
+        # Memory-only: the Summary block (if the ledger has one) is
+        # regenerated here and written by the caller's single flush
+        if "summary" in self._section_lines:
+            self._section_lines["summary"] = self._render_summary_lines()
+
+    def _fix_discrepancies(self, parsed_states: List[Tuple[str, Dict[str, Any]]]):
+        """Fix discrepancies between ledger and state files.
+
+        Takes the (path, data) pairs reconcile already decoded so nothing
+        is re-read or re-parsed here.
+        """
+        # Rebuild the unpaid section from the state files
         # This is a simplified implementation
-        content = self.ledger_path.read_text(encoding='utf-8')
-        
-        # Mark for removal (simplified)
-        lines = content.split('\n')
-        cleaned = []
-        skip_next = False
-        
-        for line in lines:
-            if '## Unpaid' in line:
-                cleaned.append(line)
-                cleaned.append('')  # Empty line after header
-                # Re-add valid unpaid invoices from state files
-                for state_file in unpaid_files:
-                    try:
-                        data = json.loads(state_file.read_text())
-                        invoice_num = data.get('invoice_number', state_file.stem)
-                        amount = data.get('amount', 0)
-                        client = data.get('client_name', 'Unknown')
-                        entry = f"- `{invoice_num}` | ${amount:.2f} | {client} | Status: unpaid"
-                        cleaned.append(entry)
-                    except:
-                        continue
-                skip_next = True
-            elif skip_next and line.strip() == '':
-                skip_next = False
-                continue
-            elif not skip_next:
-                cleaned.append(line)
-                
-        self.ledger_path.write_text('\n'.join(cleaned), encoding='utf-8')
\ No newline at end of file
+        entries = []
+        for state_file, data in parsed_states:
+            invoice_num = data.get('invoice_number', Path(state_file).stem)
+            amount = data.get('amount', 0)
+            client = data.get('client_name', 'Unknown')
+            entries.append(f"- `{invoice_num}` | ${amount:.2f} | {client} | Status: unpaid")
+
+        self._section_lines["unpaid"] = deque(entries)
+        self._index = {num: sec for num, sec in self._index.items() if sec != "unpaid"}
+        for entry in entries:
+            invoice_num = self._entry_invoice(entry)
+            if invoice_num:
+                self._index[sys.intern(invoice_num)] = "unpaid"
+                self._bloom_add(invoice_num)
+        self._journal({"op": "rebuild", "section": "unpaid", "count": len(entries)})
+        self._flush()
\ No newline at end of file
@@ -1,133 +1,250 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Iterator, List
 import json
 import logging
+import os
+import re
+import time
+
+# Optional accelerator; stdlib json keeps PyPy and minimal installs working
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 from pathlib import Path
-from .health_checker import HealthChecker
+from string import Template
+from .health_checker import HealthChecker, StateIndex, _CACHE_DIR, _iter_state_files
 
-class Dashboard:
-    """Generate HTML dashboard"""
-    
-    def __init__(self, state_dir: str, health_checker: HealthChecker, config: Dict):
-        self.state_dir = Path(state_dir) if isinstance(state_dir, str) else state_dir
-        self.health = health_checker
-        self.config = config
-        self.logger = logging.getLogger(__name__)
-    
-    def generate(self) -> str:
-        """Generate HTML dashboard"""
-        health_status = self.health.check_all()
-        state_summary = self._get_state_summary()
-        metrics = self._collect_metrics()
-        
-        html = f"""<!DOCTYPE html>
+# Activity logs that feed the metrics tables; their mtimes are part of
+# the dashboard cache key
+_ACTIVITY_LOGS = ("email_activity.log", "payment_activity.log", "error.log")
+
+# Hour-bucketed rollups of the activity logs, persisted so restarts don't
+# re-parse history; buckets older than the retention window are dropped
+_HOURLY_STATS_FILE = _CACHE_DIR / "hourly_stats.json"
+_ROLLUP_RETENTION_HOURS = 48
+
+# 24h-change figures written by the agents, read for the summary table
+_STATE_CHANGE_CACHE = _CACHE_DIR / "state_changes.json"
+
+# Fixed status vocabulary: precompute the CSS class and display label so
+# agent rows don't rebuild the same strings on every refresh
+_STATUS_CLASS = {s: f"status-{s}"
+                 for s in ("healthy", "unhealthy", "unknown", "escalated", "restarting")}
+_STATUS_LABEL = {s: s.upper() for s in _STATUS_CLASS}
+
+
+# Static page shell compiled once at import; generate() only substitutes
+# the dynamic slots instead of rebuilding the whole document per refresh
+_DASHBOARD_TMPL = Template("""<!DOCTYPE html>
 <html>
 <head>
     <title>NovotEcho Collections Dashboard</title>
     <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 20px; background-color: #f5f5f5; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .status-healthy {{ color: #28a745; font-weight: bold; }}
-        .status-unhealthy {{ color: #dc3545; font-weight: bold; }}
-        .status-unknown {{ color: #ffc107; font-weight: bold; }}
-        .status-escalated {{ color: #6f42c1; font-weight: bold; }}
-        .status-restarting {{ color: #17a2b8; font-weight: bold; }}
-        table {{ border-collapse: collapse; width: 100%; margin-bottom: 20px; }}
-        th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-        th {{ background-color: #4CAF50; color: white; }}
-        tr:nth-child(even) {{ background-color: #f2f2f2; }}
-        .metric {{ font-size: 28px; font-weight: bold; color: #333; }}
-        .metric-label {{ font-size: 14px; color: #666; }}
-        .metric-card {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 10px 0; }}
-        .errors {{ background: #f8d7da; padding: 10px; border-radius: 4px; color: #721c24; }}
-        .button {{ background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; margin: 5px; }}
-        .button:hover {{ background: #0056b3; }}
-        h1 {{ color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }}
-        h2 {{ color: #555; margin-top: 30px; }}
-        .header {{ display: flex; justify-content: space-between; align-items: center; }}
-        .timestamp {{ color: #666; font-size: 14px; }}
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 20px; background-color: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .status-healthy { color: #28a745; font-weight: bold; }
+        .status-unhealthy { color: #dc3545; font-weight: bold; }
+        .status-unknown { color: #ffc107; font-weight: bold; }
+        .status-escalated { color: #6f42c1; font-weight: bold; }
+        .status-restarting { color: #17a2b8; font-weight: bold; }
+        table { border-collapse: collapse; width: 100%; margin-bottom: 20px; }
+        th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        th { background-color: #4CAF50; color: white; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        .metric { font-size: 28px; font-weight: bold; color: #333; }
+        .metric-label { font-size: 14px; color: #666; }
+        .metric-card { background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 10px 0; }
+        .errors { background: #f8d7da; padding: 10px; border-radius: 4px; color: #721c24; }
+        .button { background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 4px; cursor: pointer; margin: 5px; }
+        .button:hover { background: #0056b3; }
+        h1 { color: #333; border-bottom: 3px solid #4CAF50; padding-bottom: 10px; }
+        h2 { color: #555; margin-top: 30px; }
+        .header { display: flex; justify-content: space-between; align-items: center; }
+        .timestamp { color: #666; font-size: 14px; }
     </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
             <h1>📊 NovotEcho Collections Dashboard</h1>
-            <div class="timestamp">Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC</div>
+            <div class="timestamp">Generated: $timestamp UTC</div>
         </div>
-        
+
         <div class="metric-card">
             <div class="metric-label">System Status</div>
-            <div class="metric">{"✅ Healthy" if all(s["status"] == "healthy" for s in health_status.values()) else "⚠️ Issues Detected"}</div>
+            <div class="metric">$system_status</div>
         </div>
-        
+
         <h2>💚 Agent Health</h2>
-        {self._render_agent_table(health_status)}
-        
+        $agent_table
+
         <h2>📈 Performance Metrics (Last 24h)</h2>
-        {self._render_metrics_table(metrics)}
-        
+        $metrics_table
+
         <h2>💰 Collection Status</h2>
-        {self._render_state_summary(state_summary)}
-        
+        $state_summary
+
         <h2>⚡ Quick Actions</h2>
         <button class="button" onclick="location.reload()">🔄 Refresh Dashboard</button>
         <button class="button" onclick="alert('Health check triggered (simulation)')">🏥 Run Health Check</button>
         <button class="button" onclick="alert('Metrics collection started (simulation)')">📊 Collect Metrics</button>
         <button class="button" onclick="alert('State reconciliation triggered (simulation)')">🔄 Reconcile State</button>
     </div>
-    
+
     <script>
         // Auto-refresh every 5 minutes
-        setTimeout(function(){{
+        setTimeout(function(){
             location.reload();
-        }}, 5 * 60 * 1000);
+        }, 5 * 60 * 1000);
     </script>
 </body>
-</html>"""
+</html>""")
+
+# Interleaved literal/slot split of the shell used by generate_stream:
+# even indexes are literal chunks, odd indexes are slot names
+_TMPL_SEGMENTS = re.split(r"\$(\w+)", _DASHBOARD_TMPL.template)
+
+class Dashboard:
+    """Generate HTML dashboard"""
+
+    # How long a cached render stays valid even when nothing changed on disk
+    _CACHE_TTL = 10.0
+
+    def __init__(self, state_dir: str, health_checker: HealthChecker, config: Dict,
+                 db_path: str = None):
+        self.state_dir = Path(state_dir) if isinstance(state_dir, str) else state_dir
+        self.health = health_checker
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self._cache_html = None
+        self._cache_key = None
+        self._cache_time = 0.0
+        # Same DB as StateConsistencyChecker so the tree is scanned once
+        self._state_index = StateIndex(self.state_dir, db_path=db_path)
+        # One collector for the dashboard's lifetime so it can keep
+        # per-log caches across refreshes
+        self._metrics = MetricsCollector(str(self.state_dir))
+
+    def _snapshot_key(self) -> tuple:
+        """Cheap change-detection key: max state-file mtime + log mtimes.
+
+        One scandir walk over state_dir (stat only, no JSON parsing) plus
+        a stat per activity log. If this tuple is unchanged, so is every
+        input to the rendered HTML.
+        """
+        latest = 0
+        if self.state_dir.exists():
+            try:
+                for entry in _iter_state_files(self.state_dir):
+                    mtime = entry.stat().st_mtime_ns
+                    if mtime > latest:
+                        latest = mtime
+            except OSError as e:
+                self.logger.warning(f"Error scanning state directory for cache key: {e}")
+
+        log_mtimes = []
+        for name in _ACTIVITY_LOGS:
+            try:
+                log_mtimes.append((_CACHE_DIR / name).stat().st_mtime_ns)
+            except OSError:
+                log_mtimes.append(0)
+
+        return (latest, *log_mtimes)
+
+    def generate_stream(self) -> Iterator[str]:
+        """Yield the dashboard HTML in chunks.
+
+        Slots render lazily as they are reached, so a caller writing
+        chunks to a socket sends the page head and health table before
+        the state scan and metrics run, and peak memory stays at one
+        chunk instead of the whole page.
+        """
+        health_status = None
+
+        def render_slot(name):
+            nonlocal health_status
+            if name == "timestamp":
+                return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            if health_status is None:
+                health_status = self.health.check_all()
+            if name == "system_status":
+                return ("✅ Healthy" if self.health.overall_healthy
+                        else "⚠️ Issues Detected")
+            if name == "agent_table":
+                return self._render_agent_table(health_status)
+            if name == "metrics_table":
+                return self._render_metrics_table(self._collect_metrics())
+            if name == "state_summary":
+                return self._render_state_summary(self._get_state_summary())
+            return ""
+
+        for i, segment in enumerate(_TMPL_SEGMENTS):
+            yield segment if i % 2 == 0 else render_slot(segment)
+
+    def generate(self) -> str:
+        """Generate HTML dashboard"""
+        # Auto-refresh hits every 5 minutes; when nothing on disk changed,
+        # serve the previous render instead of rescanning every file
+        key = self._snapshot_key()
+        if (self._cache_html is not None
+                and key == self._cache_key
+                and time.monotonic() - self._cache_time < self._CACHE_TTL):
+            return self._cache_html
+
+        html = "".join(self.generate_stream())
+        self._cache_html = html
+        self._cache_key = key
+        self._cache_time = time.monotonic()
         return html
-    
+
+
     def _render_agent_table(self, health_status: Dict) -> str:
         """Render agent health table"""
         if not health_status:
             return "<p><em>No agents to monitor</em></p>"
-        
-        rows = []
+
+        # One append-only buffer joined once at the end; per-row f-string
+        # temporaries add up with many agents on a fixed refresh cadence
+        parts = [
+            "\n        <table>\n"
+            "            <tr><th>Agent</th><th>Status</th><th>Last Heartbeat</th><th>Restarts</th></tr>\n"
+        ]
+        append = parts.append
         for name, status in health_status.items():
-            status_class = f"status-{status['status']}"
             last_heartbeat = status.get('last_heartbeat')
             if last_heartbeat:
                 if len(last_heartbeat) > 19:  # ISO format
                     last_heartbeat = last_heartbeat[:19].replace('T', ' ')
             else:
                 last_heartbeat = 'N/A'
-            
-            errors = ""
+
+            state = status['status']
+            append('            <tr>\n                <td><strong>')
+            append(name)
+            append('</strong></td>\n                <td class="')
+            append(_STATUS_CLASS.get(state, "status-unknown"))
+            append('">')
+            append(_STATUS_LABEL.get(state, state.upper()))
+            append('</td>\n                <td>')
+            append(last_heartbeat)
+            append('</td>\n                <td>')
+            append(str(status.get('restarts', 0)))
+            append('</td>\n            </tr>\n'
+                   '            <tr>\n'
+                   '                <td colspan="4" style="padding-top: 0; padding-bottom: 10px;">\n')
             if status.get('errors'):
-                errors = f"<div class='errors'><strong>Recent Errors:</strong><br>"
+                append("<div class='errors'><strong>Recent Errors:</strong><br>")
                 for err in status['errors'][-2:]:  # Show last 2 errors
-                    errors += f"• {err.get('reason', 'Unknown error')}<br>"
-                errors += "</div>"
-            
-            rows.append(f"""
-            <tr>
-                <td><strong>{name}</strong></td>
-                <td class="{status_class}">{status['status'].upper()}</td>
-                <td>{last_heartbeat}</td>
-                <td>{status.get('restarts', 0)}</td>
-            </tr>
-            <tr>
-                <td colspan="4" style="padding-top: 0; padding-bottom: 10px;">
-                    {errors}
-                </td>
-            </tr>
-            """)
-        
-        return f"""
-        <table>
-            <tr><th>Agent</th><th>Status</th><th>Last Heartbeat</th><th>Restarts</th></tr>
-            {''.join(rows)}
-        </table>
-        """
+                    append("• ")
+                    append(err.get('reason', 'Unknown error'))
+                    append("<br>")
+                append("</div>")
+            append('\n                </td>\n            </tr>\n')
+        append('        </table>\n        ')
+        return "".join(parts)
     
     def _render_metrics_table(self, metrics: Dict) -> str:
         """Render performance metrics table"""
@@ -155,43 +272,20 @@ class Dashboard:
     
     def _get_state_summary(self) -> Dict:
         """Get state summary metrics"""
-        unpaid_count, unpaid_total = 0, 0
-        paid_count, paid_total = 0, 0
-        escalated_count, escalated_total = 0, 0
-        review_count = 0
-        
-        if self.state_dir.exists():
-            try:
-                for state_file in self.state_dir.rglob("*.json"):
-                    if "archive" in str(state_file):
-                        continue
-                    
-                    try:
-                        with open(state_file) as f:
-                            data = json.load(f)
-                        
-                        status = data.get("status", "unknown")
-                        amount = data.get("amount", 0)
-                        
-                        if status == "unpaid":
-                            unpaid_count += 1
-                            unpaid_total += amount
-                        elif status == "paid":
-                            paid_count += 1
-                            paid_total += amount
-                        elif status == "escalated":
-                            escalated_count += 1
-                            escalated_total += amount
-                        elif status == "review":
-                            review_count += 1
-                            
-                    except Exception as e:
-                        self.logger.error(f"Error reading {state_file}: {e}")
-            except Exception as e:
-                self.logger.error(f"Error scanning state directory: {e}")
+        try:
+            self._state_index.sync()
+            totals = self._state_index.totals_by_status()
+        except Exception as e:
+            self.logger.error(f"Error syncing state index: {e}")
+            totals = {}
+
+        unpaid_count, unpaid_total = totals.get("unpaid", (0, 0))
+        paid_count, paid_total = totals.get("paid", (0, 0))
+        escalated_count, escalated_total = totals.get("escalated", (0, 0))
+        review_count = totals.get("review", (0, 0))[0]
         
         # Read changes from cache
-        change_cache = Path.home() / ".cache" / "novotechno-collections" / "state_changes.json"
+        change_cache = _STATE_CHANGE_CACHE
         changes = {"unpaid": 0, "paid": 0, "escalated": 0, "review": 0}
         
         if change_cache.exists():
@@ -222,8 +316,7 @@ class Dashboard:
     
     def _collect_metrics(self) -> Dict:
         """Collect current metrics"""
-        metrics_collector = MetricsCollector(str(self.state_dir))
-        return metrics_collector.get_metrics(hours=24)
+        return self._metrics.get_metrics(hours=24)
 
 class MetricsCollector:
     """Collect metrics for reporting"""
@@ -235,82 +328,103 @@ class MetricsCollector:
             self.state_dir = Path(state_dir)
         self.logger = logging.getLogger(__name__)
     
+    # (log filename, predicate) pairs driving the rollup counters, in the
+    # order the metrics are reported
+    _EVENT_SPEC = (
+        ("email_activity.log", lambda e: e.get("type") == "EMAIL_SENT"),
+        ("payment_activity.log", lambda e: e.get("type") == "PAYMENT_DETECTED"),
+        ("error.log", lambda e: e.get("level") in ("ERROR", "CRITICAL")),
+    )
+
     def get_metrics(self, hours: int = 24) -> Dict:
         """Get metrics for time window"""
         since = datetime.utcnow() - timedelta(hours=hours)
-        
+        stats = self._load_rollups()
+
+        # One pass over the spec: paths built once, one stat per log
+        emails, payments, errors = (
+            self._rollup_count(_CACHE_DIR / name, stats, since, predicate)
+            for name, predicate in self._EVENT_SPEC
+        )
+        self._save_rollups(stats)
+
         return {
-            "emails_sent": self._count_emails(since),
-            "payments_detected": self._count_payments(since),
-            "errors": self._count_errors(since),
+            "emails_sent": emails,
+            "payments_detected": payments,
+            "errors": errors,
             "avg_latency": self._avg_payment_latency(since)
         }
-    
-    def _count_emails(self, since: datetime) -> int:
-        """Count emails sent"""
-        # Read from email log
-        email_log = Path.home() / ".cache" / "novotechno-collections" / "email_activity.log"
-        count = 0
-        
-        if email_log.exists():
-            try:
-                with open(email_log) as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            timestamp = datetime.fromisoformat(entry.get("timestamp", "").replace('Z', '+00:00'))
-                            if timestamp >= since and entry.get("type") == "EMAIL_SENT":
-                                count += 1
-                        except Exception:
-                            continue
-            except Exception as e:
-                self.logger.warning(f"Error reading email log: {e}")
-        
-        return count
-    
-    def _count_payments(self, since: datetime) -> int:
-        """Count payments detected"""
-        # Read from payment log
-        payment_log = Path.home() / ".cache" / "novotechno-collections" / "payment_activity.log"
-        count = 0
-        
-        if payment_log.exists():
-            try:
-                with open(payment_log) as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            timestamp = datetime.fromisoformat(entry.get("timestamp", "").replace('Z', '+00:00'))
-                            if timestamp >= since and entry.get("type") == "PAYMENT_DETECTED":
-                                count += 1
-                        except Exception:
-                            continue
-            except Exception as e:
-                self.logger.warning(f"Error reading payment log: {e}")
-        
-        return count
-    
-    def _count_errors(self, since: datetime) -> int:
-        """Count errors"""
-        error_log = Path.home() / ".cache" / "novotechno-collections" / "error.log"
-        count = 0
-        
-        if error_log.exists():
+
+    def _load_rollups(self) -> Dict:
+        """Load the persisted hourly rollup buckets."""
+        try:
+            with open(_HOURLY_STATS_FILE, 'rb') as f:
+                return _loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_rollups(self, stats: Dict):
+        """Persist the rollup buckets atomically."""
+        try:
+            _HOURLY_STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = _HOURLY_STATS_FILE.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(stats))
+            os.replace(tmp, _HOURLY_STATS_FILE)
+        except OSError as e:
+            self.logger.warning(f"Error saving hourly stats: {e}")
+
+    def _rollup_count(self, log_path: Path, stats: Dict, since: datetime,
+                      predicate) -> int:
+        """Count matching entries newer than `since` via hourly buckets.
+
+        Buckets are keyed "YYYY-MM-DDTHH" and updated incrementally from
+        a per-log byte offset, so an unchanged log costs one stat and a
+        changed one costs only its new bytes; the 24h count is then a sum
+        over at most retention-window integers. Counting is
+        hour-granular: entries from the partial hour containing `since`
+        are included.
+        """
+        entry = stats.setdefault(
+            log_path.name, {"inode": None, "offset": 0, "buckets": {}})
+        buckets = entry["buckets"]
+
+        if log_path.exists():
             try:
-                with open(error_log) as f:
-                    for line in f:
-                        try:
-                            entry = json.loads(line.strip())
-                            timestamp = datetime.fromisoformat(entry.get("timestamp", "").replace('Z', '+00:00'))
-                            if timestamp >= since and entry.get("level") in ["ERROR", "CRITICAL"]:
-                                count += 1
-                        except Exception:
-                            continue
+                st = log_path.stat()
+                if entry["inode"] != st.st_ino or st.st_size < entry["offset"]:
+                    # New, rotated or truncated log - rebuild its buckets
+                    entry["inode"] = st.st_ino
+                    entry["offset"] = 0
+                    buckets.clear()
+                if st.st_size > entry["offset"]:
+                    with open(log_path, 'rb') as f:
+                        f.seek(entry["offset"])
+                        pos = entry["offset"]
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                break  # Partial tail write; retry next call
+                            pos += len(line)
+                            try:
+                                rec = _loads(line)
+                            except Exception:
+                                continue
+                            ts = rec.get("timestamp", "")
+                            if len(ts) >= 13 and predicate(rec):
+                                hour = ts[:13]
+                                buckets[hour] = buckets.get(hour, 0) + 1
+                        entry["offset"] = pos
             except Exception as e:
-                self.logger.warning(f"Error reading error log: {e}")
-        
-        return count
-    
+                self.logger.warning(f"Error reading log {log_path}: {e}")
+
+        # Drop buckets past retention so the stats file stays small
+        cutoff = (datetime.utcnow()
+                  - timedelta(hours=_ROLLUP_RETENTION_HOURS)).isoformat()[:13]
+        for hour in [h for h in buckets if h < cutoff]:
+            del buckets[hour]
+
+        since_key = since.isoformat()[:13]
+        return sum(count for hour, count in buckets.items() if hour >= since_key)
+
     def _avg_payment_latency(self, since: datetime) -> float:
         """Average payment detection latency in hours"""
         # This would read from state files and calculate time difference
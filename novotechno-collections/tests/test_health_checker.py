@@ -1,7 +1,10 @@
 import unittest
 import json
+import pytest
 import tempfile
 import os
+
+import orjson
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
@@ -23,14 +26,14 @@ class TestAgentHealthStatus(unittest.TestCase):
         self.assertIsNone(self.agent.last_heartbeat)
         self.assertEqual(self.agent.status, "unknown")
         self.assertEqual(self.agent.restarts, 0)
-        self.assertEqual(self.agent.errors, [])
+        self.assertEqual(len(self.agent.errors), 0)
     
     def test_update_heartbeat(self):
         """Test updating heartbeat"""
         self.agent.update_heartbeat()
         self.assertIsNotNone(self.agent.last_heartbeat)
         self.assertEqual(self.agent.status, "healthy")
-        self.assertEqual(self.agent.errors, [])
+        self.assertEqual(len(self.agent.errors), 0)
     
     def test_mark_unhealthy(self):
         """Test marking agent unhealthy"""
@@ -99,80 +102,97 @@ class TestHealthChecker(unittest.TestCase):
         self.assertTrue(len(status["errors"]) > 0)
 
 
-class TestStateConsistencyChecker(unittest.TestCase):
+@pytest.fixture(scope="class")
+def state_root(tmp_path_factory):
+    """One root directory per checker class; pytest prunes it at session end.
+
+    The old setUp/tearDown pair ran mkdtemp + rmtree around every test
+    method; a class-scoped root with per-test subdirectories amortizes
+    those directory-tree syscalls across the class.
+    """
+    return tmp_path_factory.mktemp("state_root")
+
+
+class TestStateConsistencyChecker:
     """Test StateConsistencyChecker class"""
-    
-    def setUp(self):
-        # Create temporary directory for state files
-        self.temp_dir = tempfile.mkdtemp()
-        self.checker = StateConsistencyChecker(self.temp_dir)
-    
-    def tearDown(self):
-        # Clean up temp directory
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    def test_init(self):
+
+    @pytest.fixture
+    def checker(self, state_root, request):
+        sub = state_root / request.node.name
+        sub.mkdir()
+        # Per-test index DB: the default lives under ~/.cache and is
+        # shared with the real supervisor, which tests must not touch
+        return StateConsistencyChecker(
+            str(sub), db_path=str(state_root / f"{request.node.name}.sqlite")
+        )
+
+    def test_init(self, checker, state_root, request):
         """Test state consistency checker initialization"""
-        self.assertEqual(self.checker.state_dir, Path(self.temp_dir))
-    
-    def test_reconcile_invoices_empty(self):
+        assert checker.state_dir == state_root / request.node.name
+
+    def test_reconcile_invoices_empty(self, checker):
         """Test invoice reconciliation with empty directory"""
-        result = self.checker._reconcile_invoices()
-        
-        self.assertEqual(result["unpaid_total"], 0)
-        self.assertEqual(result["paid_total"], 0)
-        self.assertEqual(result["error_count"], 0)
-        self.assertEqual(result["errors"], [])
-    
-    def test_reconcile_invoices_with_data(self):
+        result = checker._reconcile_invoices()
+
+        assert result["unpaid_total"] == 0
+        assert result["paid_total"] == 0
+        assert result["error_count"] == 0
+        assert result["errors"] == []
+
+    def test_reconcile_invoices_with_data(self, checker):
         """Test invoice reconciliation with sample data"""
-        # Create sample invoice files
+        # Create sample invoice files: encode the batch up front, then
+        # write each payload with one open/write/close round trip
+        # instead of going through the buffered text layer per file
         invoices = [
             {"id": "inv1", "amount": 100, "status": "unpaid"},
             {"id": "inv2", "amount": 200, "status": "paid"},
             {"id": "inv3", "amount": 150, "status": "unpaid"}
         ]
-        
-        for i, invoice in enumerate(invoices):
-            filepath = Path(self.temp_dir) / f"invoice_{i}.json"
-            with open(filepath, 'w') as f:
-                json.dump(invoice, f)
-        
-        result = self.checker._reconcile_invoices()
-        
-        self.assertEqual(result["unpaid_total"], 250)  # 100 + 150
-        self.assertEqual(result["paid_total"], 200)
-        self.assertEqual(result["error_count"], 0)
-    
-    def test_reconcile_invoices_malformed(self):
+        payloads = [orjson.dumps(inv) for inv in invoices]
+
+        for i, payload in enumerate(payloads):
+            fd = os.open(
+                str(checker.state_dir / f"invoice_{i}.json"),
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            )
+            try:
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+
+        result = checker._reconcile_invoices()
+
+        assert result["unpaid_total"] == 250  # 100 + 150
+        assert result["paid_total"] == 200
+        assert result["error_count"] == 0
+
+    def test_reconcile_invoices_malformed(self, checker):
         """Test invoice reconciliation with malformed files"""
         # Create a malformed JSON file
-        filepath = Path(self.temp_dir) / "malformed.json"
-        with open(filepath, 'w') as f:
-            f.write("not json")
-        
-        result = self.checker._reconcile_invoices()
-        
-        self.assertEqual(result["error_count"], 1)
-        self.assertEqual(len(result["errors"]), 1)
-    
-    def test_check_queue_health_no_queue(self):
+        (checker.state_dir / "malformed.json").write_text("not json")
+
+        result = checker._reconcile_invoices()
+
+        assert result["error_count"] == 1
+        assert len(result["errors"]) == 1
+
+    def test_check_queue_health_no_queue(self, checker):
         """Test queue health check when no queue exists"""
-        result = self.checker._check_queue_health()
-        
-        self.assertTrue(result["healthy"])
-        self.assertEqual(result["queues"], [])
-    
-    def test_reconcile_all(self):
+        result = checker._check_queue_health()
+
+        assert result["healthy"]
+        assert result["queues"] == []
+
+    def test_reconcile_all(self, checker):
         """Test full reconciliation"""
-        result = self.checker.reconcile_all()
-        
-        self.assertIn("invoices", result)
-        self.assertIn("ledger", result)
-        self.assertIn("queue", result)
-        self.assertIn("timestamp", result)
-        
+        result = checker.reconcile_all()
+
+        assert "invoices" in result
+        assert "ledger" in result
+        assert "queue" in result
+        assert "timestamp" in result
+
         # Check timestamp is valid ISO format
         datetime.fromisoformat(result["timestamp"].replace('Z', '+00:00'))
 
@@ -223,7 +243,9 @@ class TestIntegration(unittest.TestCase):
             # Setup
             agents = ["agent1", "agent2"]
             health_checker = HealthChecker(agents)
-            checker = StateConsistencyChecker(temp_dir)
+            checker = StateConsistencyChecker(
+                temp_dir, db_path=os.path.join(temp_dir, "state_index.sqlite")
+            )
             
             # Create some test data
             with open(Path(temp_dir) / "test.json", 'w') as f:
@@ -5,7 +5,8 @@ Project: PROJ-2026-0210-novotechno-collections
 
 import pytest
 import tempfile
-import json
+
+import orjson
 from pathlib import Path
 
 from src.state.ledger import Ledger, LedgerError
@@ -231,8 +232,7 @@ class TestReconciliation:
         state_dir.mkdir()
         
         state_file = state_dir / "INV-001.json"
-        with open(state_file, 'w') as f:
-            json.dump({"amount": 1000.0, "status": "unpaid"}, f)
+        state_file.write_bytes(orjson.dumps({"amount": 1000.0, "status": "unpaid"}))
         
         result = ledger.reconcile(str(state_dir))
         
@@ -255,8 +255,8 @@ class TestReconciliation:
         state_dir.mkdir()
         
         state_file = state_dir / "INV-001.json"
-        with open(state_file, 'w') as f:
-            json.dump({"amount": 500.0, "status": "unpaid"}, f)  # Different amount
+        # Different amount
+        state_file.write_bytes(orjson.dumps({"amount": 500.0, "status": "unpaid"}))
         
         result = ledger.reconcile(str(state_dir))
         
@@ -311,8 +311,7 @@ class TestSummary:
         
         assert result.exists()
         
-        with open(result) as f:
-            data = json.load(f)
+        data = orjson.loads(result.read_bytes())
         
         assert "export_date" in data
         assert "summary" in data
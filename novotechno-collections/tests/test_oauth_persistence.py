@@ -3,10 +3,12 @@ import time
 import subprocess
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from freezegun import freeze_time
+
 # Add parent directory to path for imports
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -169,53 +171,63 @@ class TestOAuthPersistence:
         assert setup_oauth.is_degraded_mode(), "DEGRADED mode not activated after 3 failures"
         assert "3 consecutive refresh failures" in setup_oauth.get_degraded_reason()
     
-    @pytest.mark.slow
     def test_2_hour_continuous_operation(self, setup_oauth):
-        """System operates continuously for 2 hours with periodic restarts"""
-        start_time = time.time()
+        """System operates continuously for 2 hours with periodic restarts.
+
+        Runs against freezegun's virtual clock: two simulated hours
+        advance in 30-second ticks, so the test exercises the same
+        restart and expiry branches as the old wall-clock loop without
+        a single real sleep.
+        """
         emails_sent = 0
-        restart_points = [0.5, 1.0, 1.5, 2.0]  # hours
+        pending_restarts = [0.5, 1.0, 1.5, 2.0]  # hours
         restarts_simulated = 0
-        
-        # Initial token setup
-        setup_oauth.cache_test_token()
-        initial_token = setup_oauth.get_cached_token()
-        
-        while time.time() - start_time < self.TEST_DURATION_HOURS * 3600:
-            # Attempt to send emails periodically (max 20)
-            if emails_sent < 20:
-                try:
-                    result = setup_oauth.send_test_email()
-                    emails_sent += 1
-                except Exception as e:
-                    # Should auto-refresh or degrade gracefully
-                    if "DEGRADED_MODE" in str(e):
-                        # If degraded after 2 hours, that's acceptable for this test
-                        break
-            
-            # Check for restarts at specified intervals
-            elapsed_hours = (time.time() - start_time) / 3600
-            for restart_hour in restart_points:
-                if abs(elapsed_hours - restart_hour) < 0.01:  # Within ~36 seconds of target
-                    if restarts_simulated < 4:
+        tick_seconds = 30
+
+        with freeze_time("2024-01-01") as frozen:
+            start_time = time.time()
+
+            # Initial token setup
+            setup_oauth.cache_test_token()
+            initial_token = setup_oauth.get_cached_token()
+
+            # Inclusive bound so the final iteration lands exactly on
+            # the 2.0 h mark and its restart point is exercised
+            while time.time() - start_time <= self.TEST_DURATION_HOURS * 3600:
+                # Attempt to send emails periodically (max 20)
+                if emails_sent < 20:
+                    try:
+                        result = setup_oauth.send_test_email()
+                        emails_sent += 1
+                    except Exception as e:
+                        # Should auto-refresh or degrade gracefully
+                        if "DEGRADED_MODE" in str(e):
+                            # If degraded after 2 hours, that's acceptable for this test
+                            break
+
+                # Fire each restart point once: the tolerance is under
+                # half a tick so only one tick can match, and a matched
+                # point is removed so it can never re-fire
+                elapsed = time.time() - start_time
+                for restart_hour in pending_restarts:
+                    if abs(elapsed - restart_hour * 3600) < tick_seconds / 2:
+                        pending_restarts.remove(restart_hour)
                         self._simulate_restart(setup_oauth)
                         restarts_simulated += 1
                         # Verify token survived restart
                         token_after_restart = setup_oauth.get_cached_token()
                         assert token_after_restart is not None, f"Token lost after restart {restarts_simulated}"
-            
-            time.sleep(30)  # Check every 30 seconds instead of 60 to speed up test
-        
-        # Wait a bit for final emails
-        time.sleep(5)
-        
-        # Verify at least 18 emails were sent (allowing for 2 failures)
-        assert emails_sent >= 18, f"Only sent {emails_sent}/20 expected emails in 2 hours"
-        assert restarts_simulated >= 3, f"Only performed {restarts_simulated}/4 simulated restarts"
-        
-        # Verify token is still valid
-        final_token = setup_oauth.get_cached_token()
-        assert final_token is not None, "Token lost after 2 hour operation"
+                        break
+
+                frozen.tick(delta=timedelta(seconds=tick_seconds))
+
+            # Verify at least 18 emails were sent (allowing for 2 failures)
+            assert emails_sent >= 18, f"Only sent {emails_sent}/20 expected emails in 2 hours"
+            assert restarts_simulated == 4, f"Performed {restarts_simulated}/4 simulated restarts"
+
+            # Verify token is still valid
+            final_token = setup_oauth.get_cached_token()
+            assert final_token is not None, "Token lost after 2 hour operation"
     
     def _simulate_restart(self, setup_oauth):
         """Simulate agent restart"""